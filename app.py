@@ -1,38 +1,53 @@
 import os
-from datetime import datetime, timedelta
-import pytz
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from flask import (
     Flask, render_template, redirect, url_for,
-    flash, request, send_from_directory
+    flash, request, send_from_directory, session
 )
 from flask_login import (
     LoginManager, login_user, logout_user,
     login_required, current_user
 )
+from flask_caching import Cache
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from flask_mail import Mail, Message
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.serving import is_running_from_reloader
 from werkzeug.utils import secure_filename
 
 from config import Config
-from models import db, User, Ticket, Comment
+from models import db, User, Ticket, TicketStatus, Comment, PK_TZ, pk_now, upgrade_schema
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
-ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg", "doc", "docx", "xls", "xlsx"}
-
-PK_TZ = pytz.timezone("Asia/Karachi")
-def create_app():
+ALLOWED_EXTENSIONS = frozenset({"pdf", "png", "jpg", "jpeg", "doc", "docx", "xls", "xlsx"})
+CLOSED_STATUSES = (TicketStatus.CLOSED, TicketStatus.APPROVED)
+PENDING_STATUSES = (TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.SOLVED)
+TICKETS_PER_PAGE = 50
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# ids per UPDATE ... IN (...) when stamping reminders (stays under SQLite's bound-parameter limit)
+REMINDER_UPDATE_BATCH = 500
+# tickets listed per reminder digest; the rest are summarised as "... and N more"
+DIGEST_MAX_LINES = 200
+
+PRIORITY_DELTAS = {
+    "Urgent": timedelta(hours=2),
+    "7 Days": timedelta(days=7),
+    "15 Days": timedelta(days=15),
+}
+DEFAULT_PRIORITY_DELTA = timedelta(days=7)
+
+def create_app(run_scheduler=None):
+    """Build the app; ``run_scheduler`` overrides the RUN_SCHEDULER setting."""
     app = Flask(__name__)
     app.config.from_object(Config)
+    if run_scheduler is None:
+        run_scheduler = app.config["RUN_SCHEDULER"]
     
-    def make_naive(dt):
-        """Convert any datetime (aware or naive) into naive PKT time for comparison."""
-        if dt is None:
-            return None
-        if dt.tzinfo is not None:
-            # convert aware datetime to PKT and strip tzinfo
-            return dt.astimezone(PK_TZ).replace(tzinfo=None)
-        return dt  # already naive
-
     # DB
     db.init_app(app)
 
@@ -40,8 +55,15 @@ def create_app():
     login_manager = LoginManager(app)
     login_manager.login_view = "login"
 
-    # Mail
+    # Cache
+    cache = Cache(app)
+
+    # Rate limiting (brute-force protection for /login)
+    limiter = Limiter(get_remote_address, app=app)
+
+    # Mail (delivered off the request thread)
     mail = Mail(app)
+    mail_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mail")
 
     # Uploads
     upload_folder = os.path.join(app.root_path, "uploads")
@@ -51,73 +73,207 @@ def create_app():
     # Scheduler for SLA reminders
     scheduler = BackgroundScheduler(daemon=True)
 
+    @cache.memoize(timeout=60)
+    def _get_user(user_id: int):
+        return User.query.get(user_id)
+
+    def dashboard_version(user_id) -> int:
+        return cache.get(f"dash-ver:{user_id}") or 0
+
+    def invalidate_dashboard(user_id):
+        """Bump the user's dashboard version so cached pages are no longer served."""
+        cache.set(f"dash-ver:{user_id}", dashboard_version(user_id) + 1, timeout=0)
+
+    def dashboard_cache_key():
+        uid = current_user.id
+        return f"dash:{uid}:{dashboard_version(uid)}:{request.query_string.decode()}"
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        user = _get_user(int(user_id))
+        if user is None:
+            return None
+        # cached copy is detached; re-attach without hitting the DB
+        return db.session.merge(user, load=False)
 
     def allowed_file(filename: str) -> bool:
-        return "." in filename and \
-               filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+        # splitext treats dotfiles like ".pdf" as having no extension
+        return os.path.splitext(filename)[1][1:].lower() in ALLOWED_EXTENSIONS
 
-    def calculate_due_time(priority: str):
-        now = datetime.now(PK_TZ).replace(tzinfo=None)
-        if priority == "Urgent":
-            return now + timedelta(hours=2)
-        elif priority == "7 Days":
-            return now + timedelta(days=7)
-        elif priority == "15 Days":
-            return now + timedelta(days=15)
-        return now + timedelta(days=7)
+    def calculate_due_time(priority: str, start=None):
+        """Due time (naive PKT) for ``priority``, counted from ``start`` or now."""
+        if start is None:
+            start = pk_now()
+        return start + PRIORITY_DELTAS.get(priority, DEFAULT_PRIORITY_DELTA)
 
 
     def ensure_pk_time(dt):
-        if dt is None:
-            return None
-        if dt.tzinfo is None:
-            # Assume the naive datetime is UTC and convert to PK time
-            dt = pytz.utc.localize(dt)
+        if dt is None or dt.tzinfo is None:
+            # naive values are already stored as PK time (see models.pk_now)
+            return dt
         return dt.astimezone(PK_TZ)
 
-    def send_email(subject: str, recipients, body: str):
+    def ticket_summary(criteria, now):
+        """Total, closed and overdue counts for the matching tickets in one aggregate query."""
+        is_closed = Ticket.status.in_(CLOSED_STATUSES)
+        return db.session.query(
+            func.count(),
+            func.count().filter(is_closed),
+            func.count().filter(and_(Ticket.due_time < now, ~is_closed)),
+        ).select_from(Ticket).filter(*criteria).one()
+
+    def make_message(subject: str, recipients, body: str):
         if not recipients:
-            return
+            return None
         if isinstance(recipients, str):
             recipients = [recipients]
+        return Message(subject=subject, recipients=recipients, body=body)
+
+    def deliver(messages):
+        """Send messages synchronously over a single SMTP session.
+
+        Returns the messages that were actually handed to the server.
+        """
+        messages = [m for m in messages if m is not None]
+        sent = []
+        if not messages:
+            return sent
         try:
-            msg = Message(subject=subject, recipients=recipients, body=body)
-            mail.send(msg)
+            with mail.connect() as conn:
+                for msg in messages:
+                    try:
+                        conn.send(msg)
+                        sent.append(msg)
+                    except Exception as e:
+                        # For debugging on RDP console
+                        print("Email error:", e)
         except Exception as e:
-            # For debugging on RDP console
             print("Email error:", e)
+        return sent
+
+    def _deliver_in_background(messages):
+        with app.app_context():
+            deliver(messages)
+
+    def send_emails(messages):
+        """Queue messages for background delivery so requests don't wait on SMTP."""
+        mail_executor.submit(_deliver_in_background, list(messages))
+
+    def send_email(subject: str, recipients, body: str):
+        msg = make_message(subject, recipients, body)
+        if msg is not None:
+            send_emails([msg])
 
     def check_ticket_deadlines():
-        """Reminder for tickets past due_time (based on their own SLA)."""
+        """Digest reminder for tickets past due_time (based on their own SLA).
+
+        Each staff member gets one email listing their overdue tickets and the
+        credentialing inbox gets one listing all of them. A ticket is only
+        reminded once per deadline; reopening it resets the guard.
+        """
         with app.app_context():
-            now = datetime.utcnow()
-            pending_statuses = ["Open", "In Progress", "Solved"]
-            overdue = Ticket.query.filter(
-                Ticket.status.in_(pending_statuses),
-                Ticket.due_time <= now
-            ).all()
-
-            for t in overdue:
-                subject = f"[Reminder] Ticket #{t.id} overdue ({t.priority})"
+            # due_time is stored as naive PKT
+            now = pk_now()
+            due = (
+                Ticket.status.in_(PENDING_STATUSES),
+                Ticket.due_time <= now,
+                Ticket.reminder_sent_at.is_(None),
+            )
+            # ORM rows are streamed in chunks grouped by staff. Each digest lists at
+            # most DIGEST_MAX_LINES tickets, so only the ticket ids kept for the
+            # reminder_sent_at update grow with the overdue count.
+            stmt = (
+                select(Ticket)
+                .options(joinedload(Ticket.staff))
+                .where(*due)
+                .order_by(Ticket.staff_id, Ticket.due_time)
+                .execution_options(yield_per=200)
+            )
+
+            def overdue_line(t):
+                return (
+                    f"- #{t.id} [{t.priority}] {t.status} | {t.practice_name} / "
+                    f"{t.provider_name} | {t.subject} (due {t.due_time:%Y-%m-%d %H:%M})"
+                )
+
+            def more_line(lines, count):
+                return [f"- ... and {count - len(lines)} more"] if count > len(lines) else []
+
+            def staff_digest(staff, lines, count):
                 body = (
-                    f"Hello,\n\n"
-                    f"Ticket #{t.id} is still '{t.status}' and has passed its SLA.\n\n"
-                    f"Staff: {t.staff.username} ({t.staff.email})\n"
-                    f"Practice: {t.practice_name}\n"
-                    f"Provider: {t.provider_name}\n"
-                    f"Subject: {t.subject}\n"
-                    f"Priority: {t.priority}\n\n"
-                    f"Please log in to the Credentialing Helpdesk Portal.\n\n"
-                    f"Regards,\nCredentialing Helpdesk System"
+                    f"Hello {staff.username},\n\n"
+                    f"The following tickets have passed their SLA:\n\n"
+                    + "\n".join(lines + more_line(lines, count))
+                    + "\n\nPlease log in to the Credentialing Helpdesk Portal.\n\n"
+                    "Regards,\nCredentialing Helpdesk System"
                 )
-                send_email(subject, [t.staff.email, app.config["MAIL_USERNAME"]], body)
+                return make_message(f"[Reminder] {count} overdue ticket(s)", [staff.email], body)
+
+            # (staff digest, ids of the tickets it covers)
+            digests, admin_lines, admin_listed = [], [], 0
+            staff, staff_lines, staff_ids, total = None, [], [], 0
+            for t in db.session.execute(stmt).scalars():
+                if staff is None or t.staff_id != staff.id:
+                    if staff is not None:
+                        digests.append((staff_digest(staff, staff_lines, len(staff_ids)), staff_ids))
+                    staff, staff_lines, staff_ids = t.staff, [], []
+                    if admin_listed < DIGEST_MAX_LINES:
+                        if admin_lines:
+                            admin_lines.append("")
+                        admin_lines.append(f"Staff: {staff.username} ({staff.email})")
+                line = overdue_line(t)
+                if len(staff_lines) < DIGEST_MAX_LINES:
+                    staff_lines.append(line)
+                if admin_listed < DIGEST_MAX_LINES:
+                    admin_lines.append(line)
+                    admin_listed += 1
+                staff_ids.append(t.id)
+                total += 1
+
+            if staff is None:
+                return
+            digests.append((staff_digest(staff, staff_lines, len(staff_ids)), staff_ids))
+            if total > admin_listed:
+                admin_lines += ["", f"... and {total - admin_listed} more overdue ticket(s)"]
+            admin_lines.append("")
 
-    # run every 30 minutes
-    scheduler.add_job(func=check_ticket_deadlines, trigger="interval", minutes=720)
-    scheduler.start()
+            body = (
+                f"Hello Credentialing Team,\n\n"
+                f"{total} ticket(s) have passed their SLA:\n\n"
+                + "\n".join(admin_lines)
+                + "\nPlease log in to the Credentialing Helpdesk Portal.\n\n"
+                "Regards,\nCredentialing Helpdesk System"
+            )
+            admin_digest = make_message(
+                f"[Reminder] {total} overdue ticket(s)", [app.config["MAIL_USERNAME"]], body
+            )
+
+            # already off the request thread: send the batch over one SMTP session
+            sent = {id(msg) for msg in deliver([msg for msg, _ in digests] + [admin_digest])}
+
+            # only stamp tickets whose staff digest went out; the rest retry next run
+            reminded = [tid for msg, ids in digests if id(msg) in sent for tid in ids]
+            for i in range(0, len(reminded), REMINDER_UPDATE_BATCH):
+                db.session.execute(
+                    update(Ticket)
+                    .where(Ticket.id.in_(reminded[i:i + REMINDER_UPDATE_BATCH]))
+                    .values(reminder_sent_at=now),
+                    execution_options={"synchronize_session": False},
+                )
+            db.session.commit()
+
+    # run every 12 hours; never overlap runs and collapse missed ones into one
+    scheduler.add_job(
+        func=check_ticket_deadlines,
+        trigger="interval",
+        minutes=720,
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=3600,
+    )
+    # only one process per deployment may send reminders; off unless asked for
+    if run_scheduler:
+        scheduler.start()
 
 
     # ---------------- ROUTES ----------------
@@ -161,6 +317,7 @@ def create_app():
         return render_template("register.html")
 
     @app.route("/login", methods=["GET", "POST"])
+    @limiter.limit("5 per minute", methods=["POST"])
     def login():
         if request.method == "POST":
             email = request.form.get("email")
@@ -176,6 +333,11 @@ def create_app():
             flash("Invalid email or password.", "danger")
         return render_template("login.html")
 
+    @app.errorhandler(429)
+    def too_many_requests(e):
+        flash("Too many login attempts. Please wait a minute and try again.", "danger")
+        return render_template("login.html"), 429
+
     @app.route("/logout")
     @login_required
     def logout():
@@ -203,32 +365,37 @@ def create_app():
     # ---------- Staff views ----------
     @app.route("/staff/dashboard")
     @login_required
+    # pending flash messages are part of the page, so never cache (or serve) those renders
+    @cache.cached(timeout=30, key_prefix=dashboard_cache_key, unless=lambda: "_flashes" in session)
     def staff_dashboard():
         if current_user.role != "staff":
             return redirect(url_for("admin_dashboard"))
 
         selected_status = request.args.get("status", "All")
 
-        query = Ticket.query.filter_by(staff_id=current_user.id)
+        page = request.args.get("page", 1, type=int)
+
+        criteria = [Ticket.staff_id == current_user.id]
         if selected_status != "All":
-            query = query.filter_by(status=selected_status)
-        tickets = query.order_by(Ticket.created_at.desc()).all()
+            criteria.append(Ticket.status == selected_status)
+        pagination = (
+            Ticket.query.filter(*criteria)
+            .options(selectinload(Ticket.staff))
+            .order_by(Ticket.created_at.desc())
+            .paginate(page=page, per_page=TICKETS_PER_PAGE, error_out=False)
+        )
+        tickets = pagination.items
 
         # Use Pakistan time directly
-        now = make_naive(datetime.now(PK_TZ))
-
-        total_tickets = len(tickets)
-        closed_tickets = sum(1 for t in tickets if t.status.lower() in ["closed", "approved"])
-        overdue_tickets = sum(
-            1 for t in tickets
-            if t.due_time and make_naive(t.due_time) < now and t.status.lower() not in ["closed", "approved"]
-        )
+        now = pk_now()
 
+        total_tickets, closed_tickets, overdue_tickets = ticket_summary(criteria, now)
 
         flashed = request.args.get("new_ticket", False)
         return render_template(
             "staff_dashboard.html",
             tickets=tickets,
+            pagination=pagination,
             selected_status=selected_status,
             now=now,
             flashed=flashed,
@@ -259,28 +426,22 @@ def create_app():
                 flash("All fields including priority are required.", "danger")
                 return redirect(url_for("create_ticket"))
 
-            # ✅ Always use Pakistan time directly (no UTC)
-            from datetime import datetime, timedelta
-            import pytz
-            PK_TZ = pytz.timezone("Asia/Karachi")
-            created_at = datetime.now(PK_TZ)
+            # ✅ Always use Pakistan time directly (no UTC), stored naive like the model defaults
+            created_at = pk_now()
 
             # Calculate due time based on priority (in PKT)
-            if priority == "Urgent":
-                due_time = created_at + timedelta(hours=2)
-            elif priority == "7 Days":
-                due_time = created_at + timedelta(days=7)
-            else:
-                due_time = created_at + timedelta(days=3)
+            due_time = calculate_due_time(priority, created_at)
 
             # ✅ Handle attachment upload
             attachment_file = request.files.get("attachment")
             filename = None
             if attachment_file and attachment_file.filename:
-                if allowed_file(attachment_file.filename):
-                    filename = secure_filename(attachment_file.filename)
+                # sanitize once and validate the name that is actually stored
+                filename = secure_filename(attachment_file.filename)
+                if filename and allowed_file(filename):
                     path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-                    attachment_file.save(path)
+                    # stream to disk in 1 MiB chunks
+                    attachment_file.save(path, buffer_size=UPLOAD_CHUNK_SIZE)
                 else:
                     flash("Invalid attachment type.", "danger")
                     return redirect(url_for("create_ticket"))
@@ -296,10 +457,11 @@ def create_app():
                 created_at=created_at,
                 due_time=due_time,
                 attachment_filename=filename,
-                status="Open",
+                status=TicketStatus.OPEN,
             )
             db.session.add(ticket)
             db.session.commit()
+            invalidate_dashboard(current_user.id)
 
             # ✅ Email logic (will work later when you enable)
             body_admin = (
@@ -313,12 +475,6 @@ def create_app():
                 f"Subject: {subject_text}\n\n"
                 f"Regards,\nCredentialing Helpdesk System"
             )
-            send_email(
-                f"[New Ticket Created] #{ticket.id} | Priority: {priority}",
-                [app.config["MAIL_USERNAME"]],
-                body_admin,
-            )
-
             body_staff = (
                 f"Hello {current_user.username},\n\n"
                 f"Your ticket #{ticket.id} has been submitted.\n\n"
@@ -326,11 +482,18 @@ def create_app():
                 f"Subject: {subject_text}\n\n"
                 f"Regards,\nCredentialing Helpdesk System"
             )
-            send_email(
-                f"[Ticket Confirmation] Ticket #{ticket.id} Submitted",
-                [current_user.email],
-                body_staff,
-            )
+            send_emails([
+                make_message(
+                    f"[New Ticket Created] #{ticket.id} | Priority: {priority}",
+                    [app.config["MAIL_USERNAME"]],
+                    body_admin,
+                ),
+                make_message(
+                    f"[Ticket Confirmation] Ticket #{ticket.id} Submitted",
+                    [current_user.email],
+                    body_staff,
+                ),
+            ])
 
             flash(f"Ticket #{ticket.id} created successfully.", "success")
             return redirect(url_for("staff_dashboard", new_ticket=True))
@@ -348,25 +511,28 @@ def create_app():
             return redirect(url_for("staff_dashboard"))
 
         status_filter = request.args.get("status", "All")
-        query = Ticket.query
+        page = request.args.get("page", 1, type=int)
+
+        criteria = []
         if status_filter != "All":
-            query = query.filter_by(status=status_filter)
-        tickets = query.order_by(Ticket.created_at.desc()).all()
+            criteria.append(Ticket.status == status_filter)
+        pagination = (
+            Ticket.query.filter(*criteria)
+            .options(selectinload(Ticket.staff))
+            .order_by(Ticket.created_at.desc())
+            .paginate(page=page, per_page=TICKETS_PER_PAGE, error_out=False)
+        )
+        tickets = pagination.items
 
         # Use Pakistan time directly
-        now = make_naive(datetime.now(PK_TZ))
-
-        total_tickets = len(tickets)
-        closed_tickets = sum(1 for t in tickets if t.status.lower() in ["closed", "approved"])
-        overdue_tickets = sum(
-            1 for t in tickets
-            if t.due_time and make_naive(t.due_time) < now and t.status.lower() not in ["closed", "approved"]
-        )
+        now = pk_now()
 
+        total_tickets, closed_tickets, overdue_tickets = ticket_summary(criteria, now)
 
         return render_template(
             "admin_dashboard.html",
             tickets=tickets,
+            pagination=pagination,
             selected_status=status_filter,
             now=now,
             total_tickets=total_tickets,
@@ -384,12 +550,13 @@ def create_app():
         ticket = Ticket.query.get_or_404(ticket_id)
         new_status = request.form.get("status")
 
-        if new_status not in ["Open", "In Progress", "Solved"]:
+        if new_status not in PENDING_STATUSES:
             flash("Invalid status.", "danger")
             return redirect(url_for("admin_dashboard"))
 
-        ticket.status = new_status
+        ticket.status = TicketStatus(new_status)
         db.session.commit()
+        invalidate_dashboard(ticket.staff_id)
 
         # Notify staff
         subject = f"[Ticket Update] Ticket #{ticket.id} is now {new_status}"
@@ -411,22 +578,22 @@ def create_app():
     @app.route("/ticket/<int:ticket_id>")
     @login_required
     def view_ticket(ticket_id):
-        ticket = Ticket.query.get_or_404(ticket_id)
-
-        # PKT conversion for consistency
-        if ticket.created_at:
-            ticket.created_at = ticket.created_at.replace(tzinfo=pytz.utc).astimezone(PK_TZ)
-        if ticket.due_time:
-            if ticket.due_time.tzinfo is None:
-                ticket.due_time = ticket.due_time.replace(tzinfo=pytz.utc).astimezone(PK_TZ)
-            else:
-                ticket.due_time = ticket.due_time.astimezone(PK_TZ)
+        ticket = Ticket.query.options(
+            joinedload(Ticket.staff),
+            selectinload(Ticket.comments).joinedload(Comment.user),
+        ).get_or_404(ticket_id)
 
         if current_user.role == "staff" and ticket.staff_id != current_user.id:
             flash("You are not allowed to view this ticket.", "danger")
             return redirect(url_for("staff_dashboard"))
 
-        return render_template("view_ticket.html", ticket=ticket)
+        # PKT conversion for display only; never write back to the attached ticket
+        return render_template(
+            "view_ticket.html",
+            ticket=ticket,
+            created_at_pkt=ensure_pk_time(ticket.created_at),
+            due_pkt=ensure_pk_time(ticket.due_time),
+        )
 
 
     @app.route("/ticket/<int:ticket_id>/attachment")
@@ -439,11 +606,18 @@ def create_app():
         if current_user.role == "staff" and ticket.staff_id != current_user.id:
             flash("Not authorized.", "danger")
             return redirect(url_for("staff_dashboard"))
-        return send_from_directory(
+        resp = send_from_directory(
             app.config["UPLOAD_FOLDER"],
             ticket.attachment_filename,
-            as_attachment=True
+            as_attachment=True,
+            conditional=True,
+            max_age=3600,
         )
+        # attachments are per-user; let browsers cache them but not shared proxies
+        # (send_file marks max_age responses public, so clear that first)
+        resp.cache_control.public = False
+        resp.cache_control.private = True
+        return resp
 
     # ---------- Comments (Two-Way Chat) ----------
     @app.route("/ticket/<int:ticket_id>/comment", methods=["POST"])
@@ -481,9 +655,10 @@ def create_app():
         action = request.form.get("action")
         cred_email = app.config["MAIL_USERNAME"]
 
-        if action == "approve_close" and ticket.status in ["Solved", "In Progress", "Open"]:
-            ticket.status = "Closed"
+        if action == "approve_close" and ticket.status in PENDING_STATUSES:
+            ticket.status = TicketStatus.CLOSED
             db.session.commit()
+            invalidate_dashboard(ticket.staff_id)
             subject = f"[Ticket Closed] #{ticket.id} Approved & Closed"
             body = (
                 f"Hello Credentialing Team,\n\n"
@@ -495,10 +670,12 @@ def create_app():
             send_email(subject, [cred_email], body)
             flash("Ticket closed.", "success")
 
-        elif action == "reopen" and ticket.status in ["Solved", "Closed"]:
-            ticket.status = "In Progress"
+        elif action == "reopen" and ticket.status in (TicketStatus.SOLVED, TicketStatus.CLOSED):
+            ticket.status = TicketStatus.IN_PROGRESS
             ticket.due_time = calculate_due_time(ticket.priority)
+            ticket.reminder_sent_at = None
             db.session.commit()
+            invalidate_dashboard(ticket.staff_id)
             subject = f"[Ticket Reopened] #{ticket.id}"
             body = (
                 f"Hello Credentialing Team,\n\n"
@@ -531,11 +708,25 @@ def create_app():
         flash(f"Ticket #{ticket.id} assigned to '{assigned_to}'.", "success")
         return redirect(url_for("admin_dashboard", status=request.args.get("status", "All")))
 
+    # ---------- CLI: run-scheduler ----------
+
+    @app.cli.command("run-scheduler")
+    def run_scheduler_command():
+        """Run only the SLA reminder scheduler (one such process per deployment)."""
+        if not scheduler.running:
+            scheduler.start()
+        print("Reminder scheduler running. Press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(3600)
+        except (KeyboardInterrupt, SystemExit):
+            scheduler.shutdown()
+
     # ---------- CLI: init-db ----------
 
     @app.cli.command("init-db")
     def init_db():
-        db.create_all()
+        upgrade_schema()
         admin_email = os.environ.get("ADMIN_EMAIL", "credentialing@docsmedicalbilling.com")
         admin = User.query.filter_by(email=admin_email).first()
         if not admin:
@@ -554,7 +745,9 @@ def create_app():
 
 
 if __name__ == "__main__":
-    app = create_app()
+    # single-process dev server: schedule reminders here, but only in the
+    # reloader's serving child, not the watcher parent
+    app = create_app(run_scheduler=is_running_from_reloader())
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -10,6 +10,9 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Let nginx/Apache serve attachment bytes (X-Sendfile); enable only behind a proxy
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE") == "1"
+
     # Gmail / Google Workspace setup
     MAIL_SERVER = "smtp.zoho.com"
     MAIL_PORT = 587
@@ -22,5 +25,15 @@ class Config:
         os.environ.get("MAIL_USERNAME", "credentialing@docsmedicalbilling.com")
     )
 
+    # Cache (current-user lookups)
+    CACHE_TYPE = "SimpleCache"
+    CACHE_DEFAULT_TIMEOUT = 60
+
+    # Rate limiting; use a shared backend (e.g. redis://) when running several workers
+    RATELIMIT_STORAGE_URI = os.environ.get("RATELIMIT_STORAGE_URI", "memory://")
+
     # Scheduler (for reminders)
     SCHEDULER_API_ENABLED = True
+    # Start the reminder scheduler in this process. Off by default so web workers
+    # don't each send reminders; `python app.py` and `flask run-scheduler` turn it on.
+    RUN_SCHEDULER = os.environ.get("RUN_SCHEDULER") == "1"
@@ -1,12 +1,31 @@
 from datetime import datetime
+from enum import Enum
+import sqlalchemy as sa
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
-import pytz
-PK_TZ = pytz.timezone("Asia/Karachi")
+from zoneinfo import ZoneInfo
+PK_TZ = ZoneInfo("Asia/Karachi")
 db = SQLAlchemy()
 
 
+def pk_now():
+    """Current Pakistan time as a naive datetime (how ticket times are stored)."""
+    return datetime.now(PK_TZ).replace(tzinfo=None)
+
+
+class TicketStatus(str, Enum):
+    """Canonical ticket statuses; the value is what is stored and displayed."""
+    OPEN = "Open"
+    IN_PROGRESS = "In Progress"
+    SOLVED = "Solved"
+    CLOSED = "Closed"
+    APPROVED = "Approved"
+
+    def __str__(self):
+        return self.value
+
+
 class User(UserMixin, db.Model):
     __tablename__ = "users"
 
@@ -16,10 +35,13 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), default="staff")  # 'staff' or 'admin'
 
-    tickets = db.relationship("Ticket", backref="staff", lazy=True)
+    # both sides declared (not backref) so Ticket.staff etc. exist before mappers are configured
+    tickets = db.relationship("Ticket", back_populates="staff", lazy=True)
+    comments = db.relationship("Comment", back_populates="user", lazy=True)
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        # scrypt is memory-hard; existing pbkdf2 hashes still verify
+        self.password_hash = generate_password_hash(password, method="scrypt")
 
     def check_password(self, password: str) -> bool:
         return check_password_hash(self.password_hash, password)
@@ -30,6 +52,12 @@ class User(UserMixin, db.Model):
 
 class Ticket(db.Model):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # match the hot filters/sorts: deadline scan, staff dashboard, admin status filter
+        db.Index("ix_tickets_status_due", "status", "due_time"),
+        db.Index("ix_tickets_staff_created", "staff_id", "created_at"),
+        db.Index("ix_tickets_status_created", "status", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     staff_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -40,16 +68,25 @@ class Ticket(db.Model):
     description = db.Column(db.Text, nullable=False)
 
     priority = db.Column(db.String(20), nullable=False)
-    status = db.Column(db.String(50), default="Open")
+    # stored as the plain value strings (VARCHAR), so existing rows read unchanged
+    status = db.Column(
+        db.Enum(TicketStatus, values_callable=lambda e: [m.value for m in e],
+                native_enum=False, length=50),
+        default=TicketStatus.OPEN,
+    )
     attachment_filename = db.Column(db.String(255))
 
     assigned_to = db.Column(db.String(255), nullable=True, default="")
     # store as local Pakistan time (naive)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(PK_TZ).replace(tzinfo=None))
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(PK_TZ).replace(tzinfo=None),
-                           onupdate=lambda: datetime.now(PK_TZ).replace(tzinfo=None))
+    created_at = db.Column(db.DateTime, default=pk_now)
+    updated_at = db.Column(db.DateTime, default=pk_now, onupdate=pk_now)
+
+    due_time = db.Column(db.DateTime, nullable=False, index=True)
+    # set once the overdue reminder has gone out; cleared when the deadline is reset
+    reminder_sent_at = db.Column(db.DateTime, nullable=True)
 
-    due_time = db.Column(db.DateTime, nullable=False)
+    staff = db.relationship("User", back_populates="tickets", lazy=True)
+    comments = db.relationship("Comment", back_populates="ticket", lazy=True)
 
 
     def __repr__(self):
@@ -63,11 +100,37 @@ class Comment(db.Model):
     ticket_id = db.Column(db.Integer, db.ForeignKey("tickets.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     message = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(PK_TZ))
+    created_at = db.Column(db.DateTime, default=pk_now)
 
     # Relationships
-    ticket = db.relationship("Ticket", backref="comments", lazy=True)
-    user = db.relationship("User", backref="comments", lazy=True)
+    ticket = db.relationship("Ticket", back_populates="comments", lazy=True)
+    user = db.relationship("User", back_populates="comments", lazy=True)
 
     def __repr__(self):
         return f"<Comment {self.id} by {self.user.username} on Ticket {self.ticket_id}>"
+
+
+# Columns added to existing tables after their first release; create_all() never alters tables.
+ADDED_COLUMNS = {
+    "tickets": ["reminder_sent_at"],
+}
+
+
+def upgrade_schema():
+    """Create missing tables, ADDED_COLUMNS and indexes. Safe to run repeatedly."""
+    db.create_all()
+    inspector = sa.inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table_name, column_names in ADDED_COLUMNS.items():
+            table = db.metadata.tables[table_name]
+            existing = {c["name"] for c in inspector.get_columns(table_name)}
+            for name in column_names:
+                if name in existing:
+                    continue
+                col_type = table.c[name].type.compile(dialect=conn.dialect)
+                conn.execute(sa.text(f"ALTER TABLE {table_name} ADD COLUMN {name} {col_type}"))
+                print(f"Added column {table_name}.{name}")
+    # create_all() skips indexes on tables that already exist
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)